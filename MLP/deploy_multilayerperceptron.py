@@ -22,22 +22,64 @@ Original file is located at
 #############################################################################
 
 
+import math
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.linalg.blas import get_blas_funcs
+from scipy.special import expit
 from abc import ABC, abstractmethod
 from typing import Tuple
 
+# numba is optional, the compiled kernels fall back to plain numpy without it
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
-def batch_generator(train_x, train_y, batch_size):
-    indices = np.arange(len(train_x))
 
-    # shuffling for fair batch generation
-    np.random.shuffle(indices)
+def gemm(a, b, alpha=1.0, trans_a=False, trans_b=False, out=None, beta=0.0):
+    """
+    alpha * op(a) @ op(b) + beta * out through the BLAS ?gemm matching the operand dtypes (sgemm for float32)
+
+    Row-major arrays are handed to the column-major BLAS as their transposes, out^T = op(b)^T @ op(a)^T,
+    so transposed operands are passed as flags instead of being copied to contiguous memory.
+
+    :param a: left operand
+    :param b: right operand
+    :param alpha: scale folded into the GEMM
+    :param trans_a: use a.T
+    :param trans_b: use b.T
+    :param out: C-contiguous float32/float64 array to write into (operands are cast to its dtype),
+                otherwise a new array is returned
+    :param beta: scale of the existing out contents added to the product (needs out)
+    :return: the product
+    """
+    if out is None:
+        blas_gemm = get_blas_funcs('gemm', (a, b))
+        return blas_gemm(alpha, b.T, a.T, trans_a=trans_b, trans_b=trans_a).T
+
+    # the routine follows out's dtype, so f2py writes straight into out and never copies it in
+    blas_gemm = get_blas_funcs('gemm', (out,))
+    if blas_gemm.dtype != out.dtype or not out.flags.c_contiguous:
+        raise ValueError(f"gemm: out must be a C-contiguous float32/float64 array, got {out.dtype}")
+    a = a.astype(out.dtype, copy=False)
+    b = b.astype(out.dtype, copy=False)
+
+    blas_gemm(alpha, b.T, a.T, beta=beta, c=out.T, trans_a=trans_b, trans_b=trans_a, overwrite_c=True)
+    return out
+
 
+def batch_generator(train_x, train_y, batch_size):
+    # shuffling for fair batch generation, one gather per epoch
+    perm = np.random.permutation(len(train_x))
+    shuffled_x = train_x[perm]
+    shuffled_y = train_y[perm]
+
+    # contiguous slices of the shuffled copy are views, no per-batch copy
     for i in range(0, len(train_x), batch_size):
-        batch_idx = indices[i:i+batch_size]
-        batch_x = train_x[batch_idx]
-        batch_y = train_y[batch_idx]
+        batch_x = shuffled_x[i:i+batch_size]
+        batch_y = shuffled_y[i:i+batch_size]
         yield batch_x, batch_y
 
 
@@ -47,13 +89,14 @@ def batch_generator(train_x, train_y, batch_size):
 
 class ActivationFunction(ABC):
     @abstractmethod
-    def forward(self, x: np.ndarray) -> np.ndarray:
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
         """
         Computes the output of the activation function, evaluated on x
 
         Input args may differ in the case of softmax
 
         :param x (np.ndarray): input
+        :param keep: cache what derivative needs for this same x (Layer.forward only, used by one derivative call)
         :return: output of the activation function
         """
         pass
@@ -69,33 +112,78 @@ class ActivationFunction(ABC):
 
 
 class Sigmoid(ActivationFunction):
-    def forward(self, x: np.ndarray) -> np.ndarray:
-        return 1 / (1 + np.exp(-x))
+    # forward input/output kept by Layer.forward, the next derivative on the same x reuses them instead of another exp
+    _x = None
+    _s = None
+
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
+        # expit is the overflow-free C sigmoid kernel, no exp/add/divide temporaries
+        s = expit(x)
+        self._x, self._s = (x, s) if keep else (None, None)
+        return s
 
     def derivative(self, x: np.ndarray) -> np.ndarray:
-        return self.forward(x) * (1 - self.forward(x))
+        s = self._s if x is self._x else expit(x)
+        # single use, a later call on the same (possibly modified) array recomputes
+        self._x = self._s = None
+        return s * (1.0 - s)
 
 
 
 
 class Tanh(ActivationFunction):
-    def forward(self, x: np.ndarray) -> np.ndarray:
-        return np.tanh(x)
+    # forward input/output kept by Layer.forward, the next derivative on the same x reuses them instead of another tanh
+    _x = None
+    _t = None
+
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
+        t = np.tanh(x)
+        self._x, self._t = (x, t) if keep else (None, None)
+        return t
 
     def derivative(self, x: np.ndarray) -> np.ndarray:
-        return 1 - np.tanh(x) ** 2
+        t = self._t if x is self._x else np.tanh(x)
+        self._x = self._t = None
+        return 1 - t ** 2
 
 
 class Relu(ActivationFunction):
-  def forward(self, x: np.ndarray) -> np.ndarray:
+  # forward input and its (x > 0) mask kept by Layer.forward, the next derivative on the same x reuses the mask
+  _x = None
+  _mask = None
+
+  def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
+    self._x, self._mask = (x, x > 0) if keep else (None, None)
     return np.maximum(0, x)
 
   def derivative(self, x: np.ndarray) -> np.ndarray:
-    return (x > 0).astype(float)
+    # boolean 0/1 mask, numpy promotes it when multiplied into the upstream gradient
+    mask = self._mask if x is self._x else x > 0
+    self._x = self._mask = None
+    return mask
+
+
+if NUMBA_AVAILABLE:
+    # row-wise softmax, max/exp/sum/scale fused per row while the row is in cache
+
+    @njit(parallel=True, fastmath=True)
+    def _softmax_rows(x, out):
+        for i in prange(x.shape[0]):
+            row_max = x[i, 0]
+            for j in range(1, x.shape[1]):
+                row_max = max(row_max, x[i, j])
+            total = 0.0
+            for j in range(x.shape[1]):
+                e = math.exp(x[i, j] - row_max)
+                out[i, j] = e
+                total += e
+            scale = 1.0 / total
+            for j in range(x.shape[1]):
+                out[i, j] *= scale
 
 
 class Softmax(ActivationFunction):
-    def forward(self, x: np.ndarray) -> np.ndarray:
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
         """
         Computes the Softmax activation function.
         Uses a stability trick to prevent overflow.
@@ -103,9 +191,18 @@ class Softmax(ActivationFunction):
         :param x: Input logits (batch_size, num_classes)
         :return: Softmax probabilities (batch_size, num_classes)
         """
-        x_max = np.max(x, axis=-1, keepdims=True)
-        exp_x = np.exp(x - x_max)
-        return exp_x / np.sum(exp_x, axis=-1, keepdims=True)
+        if NUMBA_AVAILABLE:
+            x = np.ascontiguousarray(x)
+            out = np.empty_like(x)
+            _softmax_rows(x.reshape(-1, x.shape[-1]), out.reshape(-1, x.shape[-1]))
+            return out
+
+        # single output array, the shift/exp/normalize steps all run in place on it
+        out = np.subtract(x, np.max(x, axis=-1, keepdims=True))
+        np.exp(out, out=out)
+        # one reciprocal per row, then a multiply instead of a divide per element
+        out *= np.reciprocal(np.sum(out, axis=-1, keepdims=True))
+        return out
 
     def derivative(self, x: np.ndarray) -> np.ndarray:
         """
@@ -114,85 +211,145 @@ class Softmax(ActivationFunction):
         :param x: Softmax output (batch_size, num_classes)
         :return: Jacobian matrix (batch_size, num_classes, num_classes)
         """
-        batch_size, num_classes = x.shape
-        jacobian_matrix = np.zeros((batch_size, num_classes, num_classes))
-
-        for i in range(batch_size):
-            s_i = x[i].reshape(-1, 1)
-            jacobian_matrix[i] = np.diagflat(s_i) - np.dot(s_i, s_i.T)
+        num_classes = x.shape[1]
 
-        return jacobian_matrix
+        # J[b, i, j] = s_i * (delta_ij - s_j), built for the whole batch at once
+        return x[:, :, None] * (np.eye(num_classes, dtype=x.dtype) - x[:, None, :])
 
 
 
 
 class Linear(ActivationFunction):
-    def forward(self, x: np.ndarray) -> np.ndarray:
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
         return x
 
     def derivative(self, x: np.ndarray) -> np.ndarray:
         return np.ones_like(x)
 
+
+def _softplus(x: np.ndarray) -> np.ndarray:
+    """
+    log(1 + exp(x)) as log1p(exp(-|x|)) + max(x, 0), one exp and no overflow (exp(x) is inf above ~88 in float32)
+    """
+    sp = np.exp(-np.abs(x))
+    np.log1p(sp, out=sp)
+    sp += np.maximum(x, 0)
+    return sp
+
+
 class Softplus(ActivationFunction):
-    def forward(self, x: np.ndarray) -> np.ndarray:
-        return np.log(1 + np.exp(x))
+    # forward input/output kept by Layer.forward, the next derivative on the same x reuses the output
+    _x = None
+    _sp = None
+
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
+        sp = _softplus(x)
+        self._x, self._sp = (x, sp) if keep else (None, None)
+        return sp
 
     def derivative(self, x: np.ndarray) -> np.ndarray:
-        return 1 / (1 + np.exp(-x))
+        sp = self._sp if x is self._x else None
+        self._x = self._sp = None
+        if sp is None:
+            return expit(x)
+        # sigmoid(x) = 1 - exp(-softplus(x)), expm1 keeps it accurate where the sigmoid is tiny
+        s = np.negative(sp)
+        np.expm1(s, out=s)
+        np.negative(s, out=s)
+        return s
 
 
 class Mish(ActivationFunction):
-    def forward(self, x: np.ndarray) -> np.ndarray:
-        return x * np.tanh(np.log1p(np.exp(x)))
+    def forward(self, x: np.ndarray, keep: bool = False) -> np.ndarray:
+        t = _softplus(x)
+        np.tanh(t, out=t)
+        t *= x
+        return t
 
     def derivative(self, x: np.ndarray) -> np.ndarray:
-        softplus_x = np.log1p(np.exp(x))
-        tanh_softplus = np.tanh(softplus_x)
-        return tanh_softplus + x * (1 - tanh_softplus ** 2) * (1 / (1 + np.exp(-x)))
+        tanh_softplus = _softplus(x)
+        # sigmoid(x) = 1 - exp(-softplus(x)), taken before the softplus is overwritten by its tanh
+        sig = np.negative(tanh_softplus)
+        np.expm1(sig, out=sig)
+        np.negative(sig, out=sig)
+        np.tanh(tanh_softplus, out=tanh_softplus)
+        # tanh_softplus + x * (1 - tanh_softplus ** 2) * sig, in one output array
+        out = np.square(tanh_softplus)
+        np.subtract(1, out, out=out)
+        out *= x
+        out *= sig
+        out += tanh_softplus
+        return out
 
 
 class LossFunction(ABC):
+    # clipped=True: y_pred already went through _clip (the train loop clips once per batch for loss and derivative)
+
     @abstractmethod
-    def loss(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def loss(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
         pass
 
     @abstractmethod
-    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
         pass
 
+    @staticmethod
+    def _clip(y_pred: np.ndarray) -> np.ndarray:
+        """
+        Clips probabilities away from 0 and 1 before taking logs/dividing.
+        1 - 1e-15 rounds to 1.0 in float32, so the margin is never below the dtype's resolution.
+        """
+        eps = max(1e-15, np.finfo(y_pred.dtype).eps)
+        return np.clip(y_pred, eps, 1 - eps)
+
 
 class SquaredError(LossFunction):
-    def loss(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def loss(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
         return 1/2 * np.square(y_pred-y_true)
 
-    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
         return (y_pred - y_true)/y_pred.shape[0]
 
 
 class CrossEntropy(LossFunction):
-    def loss(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def loss(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
 
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
+        if not clipped:
+            y_pred = self._clip(y_pred)
         return -np.mean(np.sum(y_true * np.log(y_pred), axis=1))
 
-    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
 
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
+        if not clipped:
+            y_pred = self._clip(y_pred)
         return -y_true / y_pred
 
+    def softmax_derivative(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+        """
+        Computes the gradient w.r.t. the logits of a Softmax output layer (Softmax + CrossEntropy fused).
+        Skips the (batch_size, num_classes, num_classes) Jacobian entirely.
+
+        :param y_true: one-hot targets (batch_size, num_classes)
+        :param y_pred: Softmax output (batch_size, num_classes)
+        :return: dL/dZ of the output layer (batch_size, num_classes)
+        """
+        return y_pred - y_true
+
 class BinaryCrossEntropy(LossFunction):
-    def loss(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def loss(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
         """
         Computes binary cross-entropy loss
         """
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
+        if not clipped:
+            y_pred = self._clip(y_pred)
         return -np.mean(y_true * np.log(y_pred) + (1 - y_true) * np.log(1 - y_pred))
 
-    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    def derivative(self, y_true: np.ndarray, y_pred: np.ndarray, clipped: bool = False) -> np.ndarray:
         """
         Computes gradient of binary cross-entropy loss
         """
-        y_pred = np.clip(y_pred, 1e-15, 1 - 1e-15)
+        if not clipped:
+            y_pred = self._clip(y_pred)
         return (y_pred - y_true) / (y_pred * (1 - y_pred) * len(y_true))
 
 
@@ -217,33 +374,59 @@ class Layer:
         #weight initilization
 
 
-        # this will store the activations (forward prop)
+        # this will store the pre-activations and activations (forward prop)
+        self.Z = None
         self.activations = None
         # this will store the delta term
         self.delta = None
         self.dropout_mask = None
+        # reusable Z buffers for the train loop's batches, keyed on (batch size, dtype)
+        self._z_buffers = {}
 
 
         #changed this to glorot uniform initialization based on the submission requirement.. I used he initialization before that.
 
 
-        self.W = np.random.uniform(-1, 1, (fan_in, fan_out)) * np.sqrt(6.0 / (fan_in + fan_out))
+        # float32 parameters so the GEMMs dispatch to SGEMM (half the memory traffic of DGEMM)
+        self.W = np.random.uniform(-1, 1, (fan_in, fan_out)).astype(np.float32) * np.float32(np.sqrt(6.0 / (fan_in + fan_out)))
         #self.W = np.random.randn(fan_in, fan_out) * np.sqrt(2.0 / fan_in)
 
-        self.b = np.zeros((fan_out,))
+        self.b = np.zeros((fan_out,), dtype=np.float32)
+
+        # gradient buffers, filled in place by backward every batch
+        self.grad_W = np.empty_like(self.W)
+        self.grad_b = np.empty_like(self.b)
 
-    def forward(self, h: np.ndarray, training = True):
+    def forward(self, h: np.ndarray, training = True, reuse_buffer: bool = False):
         """
         Computes the activations for this layer
 
         :param h: input to layer
+        :param reuse_buffer: compute Z in the layer's reusable batch buffer (train loop only, the
+                             result may be overwritten by the next call)
         :return: layer activations
         """
         #Z calculation
 
-        Z = np.dot(h, self.W) + self.b
+        # lists and other array-likes, the baseline accepted anything np.dot did
+        h = np.asarray(h)
+        if h.ndim != 2 or h.shape[0] == 0:
+            # single samples (1-D), other shapes and empty batches, the BLAS gemm path needs a non-empty 2-D h
+            Z = np.dot(h, self.W)
+            Z += self.b
+        else:
+            if reuse_buffer:
+                Z = self._z_buffer(h)
+            else:
+                Z = np.empty((h.shape[0], self.fan_out), dtype=np.result_type(h, self.W))
+            # bias broadcast into Z first, the GEMM accumulates onto it (beta=1) so there is no separate bias pass
+            Z[...] = self.b
+            gemm(h, self.W, out=Z, beta=1.0)
+        # kept for backward, activation derivatives are evaluated on Z
+        self.Z = Z
         #self.activations = None
-        activations = self.activation_function.forward(Z)
+        # only training passes keep the derivative's intermediates, nothing is pinned by inference
+        activations = self.activation_function.forward(Z, keep=training)
 
         #storing activations
 
@@ -251,14 +434,31 @@ class Layer:
 
         if training and self.dropout_rate > 0:
             # Apply dropout mask
-            self.dropout_mask = (np.random.rand(*activations.shape) > self.dropout_rate) / (1.0 - self.dropout_rate)
-            activations *= self.dropout_mask
+            # built in the activations' dtype, a float64 mask would promote every later layer to float64
+            scale = activations.dtype.type(1.0 / (1.0 - self.dropout_rate))
+            self.dropout_mask = ((np.random.rand(*activations.shape) > self.dropout_rate) * scale).astype(activations.dtype, copy=False)
+            # out of place, the activation function may have cached its output for derivative
+            activations = activations * self.dropout_mask
         else:
-            self.dropout_mask = np.ones_like(activations)
+            # no mask at inference, backward skips the multiply when it is None
+            self.dropout_mask = None
 
         self.activations = activations
         return self.activations
 
+    def _z_buffer(self, h: np.ndarray) -> np.ndarray:
+        """
+        Returns the Z buffer for a training batch of this shape, allocated on first use.
+        Only used by the train loop, where Z is consumed by backward before the next batch overwrites it.
+
+        :param h: input to layer
+        :return: uninitialized (batch_size, fan_out) array
+        """
+        key = (h.shape[0], np.result_type(h, self.W))
+        if key not in self._z_buffers:
+            self._z_buffers[key] = np.empty((h.shape[0], self.fan_out), dtype=key[1])
+        return self._z_buffers[key]
+
 
 
 
@@ -266,39 +466,46 @@ class Layer:
 
 
 
-    def backward(self, h: np.ndarray, delta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def backward(self, h: np.ndarray, delta: np.ndarray, logits_grad: bool = False) -> Tuple[np.ndarray, np.ndarray]:
       """
       Apply backpropagation to this layer and return the weight and bias gradients.
 
       :param h: Input to this layer.
       :param delta: Delta term from the layer above.
+      :param logits_grad: delta is already dL/dZ (fused Softmax + CrossEntropy), skip the activation derivative.
       :return: (Weight gradients, Bias gradients).
       """
-      if isinstance(self.activation_function, Softmax):
+      if logits_grad:
+        dZ = delta
+      elif isinstance(self.activation_function, Softmax):
 
-        # Compute the Softmax derivative using the Jacobian
+        # Jacobian-vector product J @ delta = s * (delta - s . delta), never builds the (B, C, C) Jacobian
         softmax_out = self.activations
-        softmax_jacobian = self.activation_function.derivative(softmax_out)
-
-        # Multiply Jacobian by delta
-        dZ = np.einsum('bij,bj->bi', softmax_jacobian, delta)
+        dot = np.sum(softmax_out * delta, axis=1, keepdims=True)
+        dZ = softmax_out * (delta - dot)
+      elif isinstance(self.activation_function, Linear):
+        # derivative is all ones, use delta as is
+        dZ = delta
       else:
-        dZ = delta * self.activation_function.derivative(self.activations)
+        dZ = delta * self.activation_function.derivative(self.Z)
 
 
     #apply dropout mask
       if self.dropout_rate > 0 and self.dropout_mask is not None:
-        dZ *= self.dropout_mask
+        # in place unless dZ is still the caller's delta
+        dZ = np.multiply(dZ, self.dropout_mask, out=None if dZ is delta else dZ)
 
 
 
-    # Compute weight and bias gradients
-      dL_dW = np.dot(h.T, dZ) / h.shape[0]
-      dL_db = np.sum(dZ, axis=0, keepdims=True) / h.shape[0]
+    # Compute weight and bias gradients into the layer's buffers
+      # h.T @ dZ / batch_size, the transpose and the averaging both happen inside the GEMM
+      gemm(h, dZ, alpha=1.0 / h.shape[0], trans_a=True, out=self.grad_W)
+      np.sum(dZ, axis=0, out=self.grad_b)
+      self.grad_b /= h.shape[0]
 
-      self.delta = np.dot(dZ, self.W.T)
+      self.delta = gemm(dZ, self.W, trans_b=True)
 
-      return dL_dW, dL_db
+      return self.grad_W, self.grad_b
 
 
 
@@ -311,29 +518,28 @@ class MultilayerPerceptron:
         """
         self.layers = layers
 
-    def forward(self, x: np.ndarray,training=True) -> np.ndarray:
+    def forward(self, x: np.ndarray,training=True, reuse_buffers: bool = False) -> np.ndarray:
         """
         This takes the network input and computes the network output (forward propagation)
         :param x: network input
+        :param reuse_buffers: let the layers compute Z in their reusable batch buffers (train loop only)
         :return: network output
         """
 
         for layer in self.layers:
-            x = layer.forward(x,training=training)
+            x = layer.forward(x,training=training, reuse_buffer=reuse_buffers)
         return x
 
-    def backward(self, loss_grad: np.ndarray, input_data: np.ndarray) -> Tuple[list, list]:
+    def backward(self, loss_grad: np.ndarray, input_data: np.ndarray, logits_grad: bool = False) -> None:
       """
       Applies backpropagation to compute gradients of weights and biases for all layers in the network.
 
       :param loss_grad: Gradient of loss w.r.t. final layer output (dL/dA).
       :param input_data: The input data to the network (train_x for the first layer).
-      :return: (List of weight gradients for all layers, List of bias gradients for all layers).
+      :param logits_grad: loss_grad is already dL/dZ of the final layer (fused Softmax + CrossEntropy).
+      :return: None, the gradients are left in each layer's grad_W/grad_b.
       """
 
-      dl_dw_all = []
-      dl_db_all = []
-
       dL_dA = loss_grad
 
     # Iterate backward through layers
@@ -347,20 +553,10 @@ class MultilayerPerceptron:
             h = self.layers[i - 1].activations
 
         # Compute backpropagation step for this layer
-        dL_dW, dL_db = layer.backward(h, dL_dA)
-
-
-        dl_dw_all.append(dL_dW)
-        dl_db_all.append(dL_db)
+        layer.backward(h, dL_dA, logits_grad=logits_grad and i == len(self.layers) - 1)
 
         dL_dA = layer.delta
 
-    # Reverse lists to match layer order
-      dl_dw_all.reverse()
-      dl_db_all.reverse()
-
-      return dl_dw_all, dl_db_all
-
 
 
 
@@ -384,6 +580,9 @@ class MultilayerPerceptron:
         :return:
         """
 
+        # contiguous float32 copies so every batch runs through float32 BLAS/ufunc kernels
+        train_x, train_y, val_x, val_y = (np.ascontiguousarray(a, dtype=np.float32) for a in (train_x, train_y, val_x, val_y))
+
         #initializing RMSProp parameters
         if RMSProp:
           self.beta = 0.9
@@ -392,8 +591,24 @@ class MultilayerPerceptron:
           for layer in self.layers:
             layer.m_W = np.zeros_like(layer.W)
             layer.m_b = np.zeros_like(layer.b)
+            # scratch space for the in place update
+            layer.tmp_W = np.empty_like(layer.W)
+            layer.tmp_b = np.empty_like(layer.b)
+
 
 
+        # drop Z buffers left over from earlier train calls with other batch sizes
+        for layer in self.layers:
+          layer._z_buffers.clear()
+
+        # Softmax output + CrossEntropy collapses to (y_pred - y_true) w.r.t. the logits
+        fused_softmax_ce = isinstance(loss_func, CrossEntropy) and isinstance(self.layers[-1].activation_function, Softmax)
+
+        # targets don't change between epochs, their class labels are computed once
+        train_y_class = val_y_class = None
+        if model_type == 'classification':
+          train_y_class = class_labels(train_y)
+          val_y_class = class_labels(val_y)
 
         training_losses = []
         validation_losses = []
@@ -408,134 +623,336 @@ class MultilayerPerceptron:
 
           for batch_x, batch_y in batch_generator(train_x, train_y, batch_size):
 
+            total_loss = total_loss + self._train_step(batch_x, batch_y, loss_func, learning_rate, RMSProp, fused_softmax_ce)
 
-            #forward pass
-            y_pred = self.forward(batch_x,training=True)
-
-            #compute loss
-
-            batchloss = loss_func.loss(batch_y, y_pred)
-
-            if batchloss.ndim > 0:
-              batchloss = np.mean(batchloss)
-
-
-            total_loss = total_loss + batchloss
-
-            #print(total_loss)
-
-
-
-            dL_dW, dL_db  = self.backward(loss_func.derivative(batch_y[:len(y_pred)], y_pred), batch_x)
-
-
-            #update weights
-            max_grad_norm = 1.0
 
+          num_batches = len(train_x) / batch_size
 
-            for i in range(len(self.layers)):
+          training_losses.append(total_loss / num_batches)
 
-                layer = self.layers[i]
 
 
-                if RMSProp:
-                  layer.m_W = self.beta * layer.m_W + (1 - self.beta) * (dL_dW[i] ** 2)
-                  layer.m_b = self.beta * layer.m_b + (1 - self.beta) * (dL_db[i].squeeze() ** 2)
 
-                  layer.W -= learning_rate * dL_dW[i] / (np.sqrt(layer.m_W) + self.epsilon)
+          # one inference pass over each set, shared by the validation loss and the metrics
+          val_output = self.forward(val_x, training=False)
+          train_output = self.forward(train_x, training=False)
 
-                  layer.b -= learning_rate * dL_db[i].squeeze() / (np.sqrt(layer.m_b) + self.epsilon)
+          validation_losses.append(self._end_epoch(epoch, epochs, training_losses[-1], loss_func, model_type,
+                                                   train_y, val_y, train_output, val_output, train_y_class, val_y_class))
 
-                else:
+        return training_losses, validation_losses
 
-                  layer.W -= learning_rate * dL_dW[i]
-                  layer.b -= learning_rate * dL_db[i].squeeze()
+    def _train_step(self, batch_x: np.ndarray, batch_y: np.ndarray, loss_func: LossFunction, learning_rate: float, RMSProp: bool, fused_softmax_ce: bool) -> float:
+        """
+        One batch of training: forward, loss, backward and the weight update
 
+        :param batch_x: batch input
+        :param batch_y: batch targets
+        :param loss_func: instance of a LossFunction
+        :param learning_rate: learning rate for parameter updates
+        :param RMSProp: use the RMSProp update (state set up by train)
+        :param fused_softmax_ce: output layer is Softmax and loss_func is CrossEntropy
+        :return: mean batch loss
+        """
+        #forward pass
+        # the output is consumed by loss/backward before the next batch, so the Z buffers are safe here
+        y_pred = self.forward(batch_x, training=True, reuse_buffers=True)
 
+        # the log losses clip once here, loss and derivative both take the clipped copy
+        clipped = isinstance(loss_func, (CrossEntropy, BinaryCrossEntropy))
+        y_pred_clipped = loss_func._clip(y_pred) if clipped else y_pred
 
+        #compute loss
+        batchloss = loss_func.loss(batch_y, y_pred_clipped, clipped=clipped)
 
+        if batchloss.ndim > 0:
+          batchloss = np.mean(batchloss)
 
+        if fused_softmax_ce:
+          # y_pred - y_true on the unclipped Softmax output
+          self.backward(loss_func.softmax_derivative(batch_y, y_pred), batch_x, logits_grad=True)
+        else:
+          self.backward(loss_func.derivative(batch_y, y_pred_clipped, clipped=clipped), batch_x)
 
+        #update weights
+        for layer in self.layers:
+          if RMSProp:
+            rmsprop_update(layer.W, layer.grad_W, layer.m_W, layer.tmp_W, learning_rate, self.beta, self.epsilon)
+            rmsprop_update(layer.b, layer.grad_b, layer.m_b, layer.tmp_b, learning_rate, self.beta, self.epsilon)
+          else:
+            layer.W -= learning_rate * layer.grad_W
+            layer.b -= learning_rate * layer.grad_b
 
+        return batchloss
 
+    def _end_epoch(self, epoch: int, epochs: int, training_loss: float, loss_func: LossFunction, model_type: str,
+                   train_y: np.ndarray, val_y: np.ndarray, train_output: np.ndarray, val_output: np.ndarray,
+                   train_y_class: np.ndarray = None, val_y_class: np.ndarray = None) -> float:
+        """
+        End of epoch bookkeeping shared by train and train_jax: validation loss, metrics and the progress line
 
-          num_batches = len(train_x) / batch_size
+        :param epoch: index of the epoch that just finished
+        :param epochs: number of epochs
+        :param training_loss: mean training loss of the epoch
+        :param loss_func: instance of a LossFunction
+        :param model_type: type of the model(regression/classification)
+        :param train_y: full training set output
+        :param val_y: full validation set output
+        :param train_output: model output for the training set
+        :param val_output: model output for the validation set
+        :param train_y_class: class_labels(train_y), classification only
+        :param val_y_class: class_labels(val_y), classification only
+        :return: validation loss
+        """
+        val_loss = loss_func.loss(val_y, val_output)
 
-          training_losses.append(total_loss / num_batches)
+        # Ensure val_loss is scalar
+        val_loss = np.mean(val_loss) if val_loss.ndim > 0 else val_loss
 
+        # Compute accuracy at the end of the epoch based on the model type
+        if model_type == 'classification':
+          train_acc = compute_accuracy(self, None, train_y, y_pred=train_output, y_true_class=train_y_class)
+          val_acc = compute_accuracy(self, None, val_y, y_pred=val_output, y_true_class=val_y_class)
 
+          print(f"Epoch {epoch+1}/{epochs} - Training Loss: {training_loss:.4f} - Training Acc: {train_acc:.2f}% - Validation Acc: {val_acc:.2f}% - Validation Loss: {val_loss:.4f}")
 
+        else:
+          train_mse, train_mae, train_r2 = compute_regression_metrics(self, None, train_y, y_pred=train_output)
+          val_mse, val_mae, val_r2 = compute_regression_metrics(self, None, val_y, y_pred=val_output)
 
-          val_output = self.forward(val_x,training = False)
-          val_loss = loss_func.loss(val_y, val_output)
+          print(f"Epoch {epoch+1}/{epochs} - Training MSE: {train_mse:.4f} - Validation MSE: {val_mse:.4f} - Training MAE: {train_mae:.4f} - Validation MAE: {val_mae:.4f} - Training R²: {train_r2:.4f} - Validation R²: {val_r2:.4f}")
 
-          # Ensure val_loss is scalar
-          validation_losses.append(np.mean(val_loss) if val_loss.ndim > 0 else val_loss)
+        return val_loss
 
+    def train_jax(self, train_x: np.ndarray, train_y: np.ndarray, val_x: np.ndarray, val_y: np.ndarray, loss_func: LossFunction, learning_rate: float=1E-3, batch_size: int=16, epochs: int=32, model_type: str="classification",RMSProp: bool=False, seed: int=0) -> Tuple[list, list]:
+        """
+        Train the multilayer perceptron with JAX instead of the numpy forward/backward (needs jax installed)
 
+        Forward, loss and the weight update are compiled with jax.jit, so XLA fuses the matmuls, activations
+        and dropout, and runs them on GPU/TPU when one is available. Gradients come from jax.grad of the mean
+        batch loss instead of the hand written backward. Each epoch is one lax.scan over the batches.
+        The trained weights are copied back into self.layers, so forward/compute_* work as after train.
 
+        Arguments are the same as train, and the gradients match train's for every loss (train scales the
+        SquaredError/BinaryCrossEntropy gradients by 1 / batch_size ** 2, so the learning rates carry over), plus
+        :param seed: seed for the jax.random dropout keys
 
-          # Compute training accuracy at the end of the epoch based on the model type
+        :return: training losses, validation losses
+        """
+        import jax
+        import jax.numpy as jnp
+        from jax import lax
+
+        jax_activations = {
+            Sigmoid: jax.nn.sigmoid,
+            Tanh: jnp.tanh,
+            Relu: jax.nn.relu,
+            Softmax: lambda z: jax.nn.softmax(z, axis=-1),
+            Linear: lambda z: z,
+            Softplus: jax.nn.softplus,
+            Mish: lambda z: z * jnp.tanh(jax.nn.softplus(z)),
+        }
+        for layer in self.layers:
+            if type(layer.activation_function) not in jax_activations:
+                raise ValueError(f"train_jax does not support {type(layer.activation_function).__name__}")
+        if type(loss_func) not in (SquaredError, CrossEntropy, BinaryCrossEntropy):
+            raise ValueError(f"train_jax does not support {type(loss_func).__name__}")
+
+        train_x, train_y, val_x, val_y = (np.ascontiguousarray(a, dtype=np.float32) for a in (train_x, train_y, val_x, val_y))
+
+        activations = [jax_activations[type(layer.activation_function)] for layer in self.layers]
+        dropout_rates = [layer.dropout_rate for layer in self.layers]
+        fused_softmax_ce = isinstance(loss_func, CrossEntropy) and isinstance(self.layers[-1].activation_function, Softmax)
+        eps = float(np.finfo(np.float32).eps)
+        beta, epsilon = 0.9, 1e-8
+
+        def forward_fn(params, x, key=None):
+            # returns the output layer's Z and activations, dropout only when a key is given
+            for i, ((W, b), activation) in enumerate(zip(params, activations)):
+                Z = x @ W + b
+                x = activation(Z)
+                if key is not None and dropout_rates[i] > 0:
+                    key, subkey = jax.random.split(key)
+                    keep = jax.random.bernoulli(subkey, 1.0 - dropout_rates[i], x.shape)
+                    x = x * keep / (1.0 - dropout_rates[i])
+            return Z, x
+
+        def loss_fn(params, x, y, key):
+            # returns (objective to differentiate, mean batch loss as train reports it)
+            Z, y_pred = forward_fn(params, x, key)
+            if fused_softmax_ce:
+                # log_softmax on the logits, no clipping needed
+                loss = -jnp.mean(jnp.sum(y * jax.nn.log_softmax(Z, axis=-1), axis=1))
+                return loss, loss
+            if isinstance(loss_func, CrossEntropy):
+                loss = -jnp.mean(jnp.sum(y * jnp.log(jnp.clip(y_pred, eps, 1 - eps)), axis=1))
+                return loss, loss
+            if isinstance(loss_func, BinaryCrossEntropy):
+                y_pred = jnp.clip(y_pred, eps, 1 - eps)
+                losses = -(y * jnp.log(y_pred) + (1 - y) * jnp.log(1 - y_pred))
+            else:
+                losses = 0.5 * jnp.square(y_pred - y)
+            # train's SquaredError/BinaryCrossEntropy derivatives divide by the batch size and Layer.backward
+            # averages over the batch again, so its gradients are those of sum / batch_size ** 2
+            return jnp.sum(losses) / x.shape[0] ** 2, jnp.mean(losses)
+
+        def step(carry, batch):
+            params, m = carry
+            x, y, key = batch
+            (_, loss), grads = jax.value_and_grad(loss_fn, has_aux=True)(params, x, y, key)
+            if RMSProp:
+                m = jax.tree_util.tree_map(lambda m_, g: beta * m_ + (1 - beta) * g ** 2, m, grads)
+                params = jax.tree_util.tree_map(lambda p, g, m_: p - learning_rate * g / (jnp.sqrt(m_) + epsilon), params, grads, m)
+            else:
+                params = jax.tree_util.tree_map(lambda p, g: p - learning_rate * g, params, grads)
+            return (params, m), loss
+
+        @jax.jit
+        def run_batches(params, m, xs, ys, keys):
+            (params, m), losses = lax.scan(step, (params, m), (xs, ys, keys))
+            return params, m, jnp.sum(losses)
+
+        predict = jax.jit(lambda params, x: forward_fn(params, x)[1])
+
+        # parameters as a pytree: one (W, b) tuple per layer
+        params = [(jnp.asarray(layer.W), jnp.asarray(layer.b)) for layer in self.layers]
+        m = jax.tree_util.tree_map(jnp.zeros_like, params)
+        key = jax.random.PRNGKey(seed)
+
+        n = len(train_x)
+        n_full = n // batch_size
+        n_tail = n - n_full * batch_size
+
+        # targets don't change between epochs, their class labels are computed once
+        train_y_class = val_y_class = None
+        if model_type == 'classification':
+          train_y_class = class_labels(train_y)
+          val_y_class = class_labels(val_y)
 
-          if model_type == 'classification':
-            train_acc = compute_accuracy(self, train_x, train_y)
-            val_acc = compute_accuracy(self, val_x, val_y)
+        training_losses = []
+        validation_losses = []
 
-            #print(f"{training_losses}")
+        for epoch in range(epochs):
+          perm = np.random.permutation(n)
+          X, Y = train_x[perm], train_y[perm]
+          key, *batch_keys = jax.random.split(key, n_full + 2)
+          batch_keys = jnp.stack(batch_keys)
 
-            print(f"Epoch {epoch+1}/{epochs} - Training Loss: {training_losses[-1]:.4f} - Training Acc: {train_acc:.2f}% - Validation Acc: {val_acc:.2f}% - Validation Loss: {validation_losses[-1]:.4f}")
+          params, m, total_loss = run_batches(params, m,
+                                              X[:n_full * batch_size].reshape(n_full, batch_size, X.shape[1]),
+                                              Y[:n_full * batch_size].reshape(n_full, batch_size, Y.shape[1]),
+                                              batch_keys[:n_full])
+          if n_tail:
+            # ragged last batch, compiled once for its own shape
+            params, m, tail_loss = run_batches(params, m, X[None, -n_tail:], Y[None, -n_tail:], batch_keys[n_full:])
+            total_loss = total_loss + tail_loss
 
-          else:
-            # Compute regression metrics first
-            train_mse, train_mae, train_r2 = compute_regression_metrics(self, train_x, train_y)
-            val_mse, val_mae, val_r2 = compute_regression_metrics(self, val_x, val_y)
+          training_losses.append(float(total_loss) / (n / batch_size))
 
+          train_output = np.asarray(predict(params, train_x))
+          val_output = np.asarray(predict(params, val_x))
 
-            train_mse = float(train_mse)
-            train_mae = float(train_mae)
-            train_r2 = float(train_r2)
+          validation_losses.append(self._end_epoch(epoch, epochs, training_losses[-1], loss_func, model_type,
+                                                   train_y, val_y, train_output, val_output, train_y_class, val_y_class))
 
-            val_mse = float(val_mse)
-            val_mae = float(val_mae)
-            val_r2 = float(val_r2)
+        # hand the trained weights back to the numpy layers
+        for layer, (W, b) in zip(self.layers, params):
+          layer.W = np.array(W)
+          layer.b = np.array(b)
 
-            print(f"Epoch {epoch+1}/{epochs} - Training MSE: {train_mse:.4f} - Validation MSE: {val_mse:.4f} - Training MAE: {train_mae:.4f} - Validation MAE: {val_mae:.4f} - Training R²: {train_r2:.4f} - Validation R²: {val_r2:.4f}")
+        return training_losses, validation_losses
 
 
+#helper functions
 
+if NUMBA_AVAILABLE:
+    # whole RMSProp step in one pass, one call per parameter instead of ~9 numpy dispatches
 
+    # scalars arrive already cast to param's dtype (no float literals in the loop), so float32 stays float32
+    @njit(parallel=True, fastmath=True)
+    def _rmsprop_kernel(param, grad, m, learning_rate, beta, one_minus_beta, epsilon):
+        for i in prange(param.size):
+            g = grad[i]
+            m_i = beta * m[i] + one_minus_beta * g * g
+            m[i] = m_i
+            param[i] -= learning_rate * g / (np.sqrt(m_i) + epsilon)
 
 
+def rmsprop_update(param, grad, m, tmp, learning_rate, beta, epsilon):
+    """
+    One RMSProp step, param and m are updated in place with tmp as the only scratch array.
 
+    m = beta * m + (1 - beta) * grad^2
+    param -= learning_rate * grad / (sqrt(m) + epsilon)
+    """
+    if NUMBA_AVAILABLE and param.flags.c_contiguous and m.flags.c_contiguous:
+        # reshape(-1) of a contiguous array is a view, the kernel writes straight into param and m
+        # python float scalars would make numba do the per-element math in float64
+        dtype = param.dtype.type
+        _rmsprop_kernel(param.reshape(-1), grad.reshape(-1), m.reshape(-1),
+                        dtype(learning_rate), dtype(beta), dtype(1 - beta), dtype(epsilon))
+        return
+
+    np.square(grad, out=tmp)
+    tmp *= 1 - beta
+    m *= beta
+    m += tmp
+
+    np.sqrt(m, out=tmp)
+    tmp += epsilon
+    np.divide(grad, tmp, out=tmp)
+    tmp *= learning_rate
+    param -= tmp
+
+
+def class_labels(y):
+    """
+    Class labels of one-hot (argmax) or single column binary targets
 
-        return training_losses, validation_losses
+    :param y: targets (n x q)
+    :return: class labels
+    """
+    if y.shape[1] > 1:
+        return np.argmax(y, axis=1)
+    return y.astype(int)
 
 
-#helper functions
+def compute_accuracy(model, X, y, y_pred=None, y_true_class=None):
+    """
+    Compute classification accuracy in percent.
 
-def compute_accuracy(model, X, y):
-    y_pred = model.forward(X)
+    :param model: Trained MLP model
+    :param X: Input features (numpy array)
+    :param y: True labels, one-hot or a single binary column (numpy array)
+    :param y_pred: model output for X if already computed, skips another forward pass
+    :param y_true_class: class_labels(y) if already computed, skips the argmax over y
+    :return: accuracy in percent
+    """
+    if y_pred is None:
+        y_pred = model.forward(X, training=False)
+    if y_true_class is None:
+        y_true_class = class_labels(y)
     if y.shape[1] > 1:
         y_pred_class = np.argmax(y_pred, axis=1)
-        y_true_class = np.argmax(y, axis=1)
     else:
         y_pred_class = (y_pred > 0.5).astype(int)
-        y_true_class = y.astype(int)
 
     return np.mean(y_pred_class == y_true_class) * 100
 
 
 
-def compute_regression_metrics(model, X, y):
+def compute_regression_metrics(model, X, y, y_pred=None):
     """
     Compute evaluation metrics for regression tasks (MPG).
 
     :param model: Trained MLP model
     :param X: Input features (numpy array)
     :param y: True labels (numpy array)
+    :param y_pred: model output for X if already computed, skips another forward pass
     :return: MSE, MAE, R² Score (all as Python floats)
     """
-    y_pred = model.forward(X)
+    if y_pred is None:
+        y_pred = model.forward(X, training=False)
 
     mse = np.mean((y - y_pred) ** 2)
     mae = np.mean(np.abs(y - y_pred))